@@ -1,8 +1,65 @@
 #!/usr/bin/env ipython
 
-import re  # for regex
-
-
+from functools import lru_cache  # memoize repeated conversions
+
+_ROMAN_MAP = {"I": 1, "V": 5, "X": 10, "L": 50, "C": 100, "D": 500, "M": 1000}
+
+# Strict Input Validation using a DFA
+# The grammar is the same as the old regex:
+# ^(M{0,3})(CM|CD|D?C{0,3})(XL|XC|L?X{0,3})(IV|IX|V?I{0,3})$
+# - M, C, X, I can repeat up to three times (e.g., MMM, CCC, III)
+# - V, L, D cannot repeat (e.g., VV is invalid)
+# - Valid subtractive pairs: IV, IX, XL, XC, CD, CM
+#
+# Each group (thousands, hundreds, tens, ones) is the same small automaton over
+# its (one, five, ten) symbols, e.g. (I, V, X) for the ones:
+# 0: nothing yet   1-3: "1" .. "111"   4-7: "5" .. "5111"   8: "15" / "1T" (closed)
+#
+# Each transition also carries the value it adds, so validation and conversion
+# share one pass. The subtractive pairs correct for the "1" already added:
+# IV adds 5 - 2*1 = +3, IX adds 10 - 2*1 = +8 (and likewise for XL, CM, ...).
+_GROUPS = (("M", None, None), ("C", "D", "M"), ("X", "L", "C"), ("I", "V", "X"))
+_GROUP_STATES = 9
+
+
+def _build_transitions() -> tuple:
+    """Builds the table[state][char] -> (next_state, delta) for the four-group grammar."""
+    trans = {}
+    for g, (one, five, ten) in enumerate(_GROUPS):
+        base = g * _GROUP_STATES
+        unit = _ROMAN_MAP[one]
+        local = {0: {one: (1, unit)}, 1: {one: (2, unit)}, 2: {one: (3, unit)}}
+        if five:
+            local[0][five] = (4, 5 * unit)
+            local[1].update({five: (8, 3 * unit), ten: (8, 8 * unit)})
+            local.update(
+                {4: {one: (5, unit)}, 5: {one: (6, unit)}, 6: {one: (7, unit)}}
+            )
+        for sub in range(_GROUP_STATES):
+            trans[base + sub] = {
+                ch: (base + nxt, delta)
+                for ch, (nxt, delta) in local.get(sub, {}).items()
+            }
+
+    # Any group may be skipped: from every state of group g we can start any later group
+    for g in range(len(_GROUPS)):
+        for later in range(g + 1, len(_GROUPS)):
+            entry = trans[later * _GROUP_STATES]
+            for sub in range(_GROUP_STATES):
+                for ch, step in entry.items():
+                    trans[g * _GROUP_STATES + sub].setdefault(ch, step)
+
+    # States are dense ints, so index a tuple rather than hashing into a dict
+    return tuple(trans[state] for state in range(len(trans)))
+
+
+# Every group is optional, so every reachable state is accepting:
+# invalid input is rejected only by a missing transition.
+_TRANS = _build_transitions()
+_REJECT = (-1, 0)
+
+
+@lru_cache(maxsize=4096)
 def roman_to_int_strict(s: str) -> int:
     """
     Converts a Roman numeral string to an integer, strictly enforcing
@@ -13,46 +70,30 @@ def roman_to_int_strict(s: str) -> int:
     if not s:
         return 0
 
-    roman_map = {"I": 1, "V": 5, "X": 10, "L": 50, "C": 100, "D": 500, "M": 1000}
-
-    # Strict Input Validation using Regex
-    # This pattern captures the rules:
-    # - M, C, X, I can repeat up to three times (e.g., MMM, CCC, III)
-    # - V, L, D cannot repeat (e.g., VV is invalid)
-    # - Valid subtractive pairs: IV, IX, XL, XC, CD, CM
-
-    # Pattern explanation:
-    # ^(M{0,3})          -> Hundreds/Thousands: 0 to 3 'M's
-    # (CM|CD|D?C{0,3})   -> Hundreds: CM/CD, or D followed by up to 3 C's, or up to 3 C's
-    # (XL|XC|L?X{0,3})   -> Tens: XL/XC, or L followed by up to 3 X's, or up to 3 X's
-    # (IV|IX|V?I{0,3})$  -> Ones: IV/IX, or V followed by up to 3 I's, or up to 3 I's
-    roman_pattern = re.compile(
-        r"^(M{0,3})(CM|CD|D?C{0,3})(XL|XC|L?X{0,3})(IV|IX|V?I{0,3})$"
-    )
-
-    if not roman_pattern.fullmatch(s):
-        # This catches "A", "VV", "IIII", "IC", and other structurally invalid numerals.
-        raise ValueError(
-            f"'{s}' is not a valid Roman numeral string (e.g., invalid characters, repetition, or sequence)."
-        )
-
-    # Conversion Logic (The original correct iterative algorithm)
+    # Walk the DFA, accumulating the value as we go; a missing transition
+    # catches "A", "VV", "IIII", "IC", and other structurally invalid numerals.
+    # Bind the table and sentinel locally to skip global lookups per character
+    trans, reject = _TRANS, _REJECT
+    state = 0
     converted_number = 0
+    for ch in s:
+        state, delta = trans[state].get(ch, reject)
+        if state < 0:
+            raise ValueError(
+                f"'{s}' is not a valid Roman numeral string (e.g., invalid characters, repetition, or sequence)."
+            )
+        converted_number += delta
 
-    for i in range(len(s)):
-        # We can now safely access the map, as the regex already checked for invalid characters.
-        current_number = roman_map[s[i]]
-
-        # Look ahead for the next number, 0 if at the end of the string
-        next_number = roman_map[s[i + 1]] if i + 1 < len(s) else 0
+    return converted_number
 
-        # Subtractive rule logic: if current is less than next, subtract it.
-        if current_number < next_number:
-            converted_number -= current_number
-        else:
-            converted_number += current_number
 
-    return converted_number
+def roman_to_int_strict_batch(numerals) -> list:
+    """
+    Converts an iterable of Roman numeral strings to a list of integers.
+    Raises ValueError on the first invalid numeral, like roman_to_int_strict.
+    """
+    # map() drives the loop in C and repeated numerals hit the lru_cache
+    return list(map(roman_to_int_strict, numerals))
 
 
 # --- Test Cases --- (RUN to test functionality without pytest)
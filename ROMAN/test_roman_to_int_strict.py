@@ -3,7 +3,7 @@
 import pytest
 
 # Assuming your function is saved in a file named roman_converter.py
-from roman_to_int_strict import roman_to_int_strict
+from roman_to_int_strict import roman_to_int_strict, roman_to_int_strict_batch
 
 
 # Test Valid Conversions
@@ -78,3 +78,29 @@ def test_invalid_input_raises_error(invalid_roman):
 
     # check if the error message is descriptive
     assert "not a valid Roman numeral string" in str(excinfo.value)
+
+
+# Test Memoization
+def test_repeated_calls_are_cached():
+    """Tests that valid results are cached and invalid inputs keep raising."""
+    roman_to_int_strict.cache_clear()
+    assert roman_to_int_strict("MCMXCIV") == 1994
+    assert roman_to_int_strict("MCMXCIV") == 1994
+    assert roman_to_int_strict.cache_info().hits == 1
+
+    # Exceptions are never cached, so every call re-validates
+    for _ in range(2):
+        with pytest.raises(ValueError):
+            roman_to_int_strict("IIII")
+
+
+# Test Batch Conversion
+def test_batch_conversion():
+    """Tests converting several numerals at once, including the empty string."""
+    assert roman_to_int_strict_batch(["III", "", "MCMXCIV", "III"]) == [3, 0, 1994, 3]
+
+
+def test_batch_conversion_invalid():
+    """Tests that an invalid numeral anywhere in the batch raises a ValueError."""
+    with pytest.raises(ValueError):
+        roman_to_int_strict_batch(["X", "IC"])
@@ -1,11 +1,69 @@
+import itertools
 import subprocess
 import shutil
+import string
+import threading
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from pytubefix import YouTube, AsyncYouTube
 from pytubefix.exceptions import RegexMatchError, VideoUnavailable
-from os import makedirs, path
+from os import makedirs, path, remove, replace
+from time import monotonic
 
 from PySide6.QtCore import QRunnable, Slot, QObject, Signal
 
+PROGRESS_MIN_INTERVAL = 0.05  # seconds between progress signals (~20 Hz)
+
+
+class _TitleTable(dict):
+    """str.translate table for file-safe titles: keeps alnum + " _-", drops the rest.
+    Codepoints are classified on first sight, then translate stays in C."""
+
+    def __missing__(self, codepoint):
+        char = chr(codepoint)
+        keep = char.isalnum() or char in " _-"
+        self[codepoint] = codepoint if keep else None
+        return self[codepoint]
+
+
+_TITLE_TABLE = _TitleTable()
+
+# ASCII titles (the usual case) skip the dict entirely: bytes.translate delete set
+_TITLE_KEEP_ASCII = (string.ascii_letters + string.digits + " _-").encode()
+_TITLE_DROP_ASCII = bytes(c for c in range(128) if c not in _TITLE_KEEP_ASCII)
+
+
+def _safe_title(title: str) -> str:
+    if title.isascii():
+        title = title.encode().translate(None, _TITLE_DROP_ASCII).decode()
+    else:  # keep non-ASCII letters (é, ü, ...) like str.isalnum() does
+        title = title.translate(_TITLE_TABLE)
+    return title.rstrip() or "ytdl"
+
+
+# output files some job is still merging into -> parallel jobs never share one
+_OUTPUTS_IN_FLIGHT = set()
+_OUTPUTS_LOCK = threading.Lock()
+
+
+def _claim_output(output_file: str) -> str:
+    """Reserves output_file for one job; a name already in flight (same link twice,
+    titles that sanitize alike) gets a " (n)" suffix instead."""
+    stem, ext = path.splitext(output_file)
+    with _OUTPUTS_LOCK:
+        for n in itertools.count(1):
+            if output_file not in _OUTPUTS_IN_FLIGHT:
+                break
+            output_file = f"{stem} ({n}){ext}"
+        _OUTPUTS_IN_FLIGHT.add(output_file)
+    return output_file
+
+
+def _release_output(output_file: str) -> None:
+    with _OUTPUTS_LOCK:
+        _OUTPUTS_IN_FLIGHT.discard(output_file)
+
 
 class WorkerSignals(QObject):
     finished = Signal()
@@ -14,6 +72,32 @@ class WorkerSignals(QObject):
     error = Signal(str)
 
 
+class MkdirSignals(QObject):
+    done = Signal(str)
+    error = Signal(str)
+
+
+class MkdirTask(QRunnable):
+    """Creates the download folder off the GUI thread
+    (slow/remote ~/Videos mounts would otherwise freeze the window)"""
+
+    def __init__(self, folder_path: str) -> None:
+        super().__init__()
+        self.folder_path = folder_path
+        self.mkdir_signals = MkdirSignals()
+
+    @Slot()
+    def run(self):
+        try:
+            makedirs(self.folder_path, exist_ok=True)
+        except Exception as e:
+            self.mkdir_signals.error.emit(
+                f"Failed to access folder {self.folder_path}: {e}"
+            )
+        else:
+            self.mkdir_signals.done.emit(self.folder_path)
+
+
 class Worker(QRunnable):
     """Async Download Youtube Video + FFMPEG merger
     Intake:
@@ -29,36 +113,98 @@ class Worker(QRunnable):
         self.url = url  # HACK !null
         self.folder_path = path.expanduser(folder_path)
         self.worker_signals = WorkerSignals()
-        # self.temp_yt_folder = path.join("/tmp", "ytbr_" + uuid.uuid4().hex)
-        self.temp_yt_folder = "/tmp/ytbr"
+        # progress hot path: bound emit + byte counts over both streams
+        self._emit_progress = self.worker_signals.progress.emit
+        self._progress_lock = threading.Lock()  # video + audio call back concurrently
+        self._remaining = {}  # stream -> bytes still to download
+        self._progress_done = 0
+        self._progress_total = 0
+        self._last_pct = -1
+        self._last_emit = float("-inf")  # monotonic() of the last progress signal
+        self._duration_s = 0  # video length, used to scale ffmpeg merge progress
+        # per-job id: parallel jobs must not share video.mp4/audio.mp4 or .part files
+        self.job_id = uuid.uuid4().hex
+        self.temp_yt_folder = path.join("/tmp", "ytbr_" + self.job_id)
 
     def on_progress_callback(self, stream, chunk, bytes_remaining):
         """NOTE Async process (filtering, metadata) so progress-bar hovers at 0 for a while"""
         try:
-            total = stream.filesize
-            done = total - bytes_remaining
-            # percent = int(done * 65 / total)  # HACK only video
-            percent = int(done * 100 / total)  # HACK only video
-            self.worker_signals.progress.emit(percent)
+            with self._progress_lock:
+                if stream not in self._remaining:  # unseen stream -> size it once
+                    self._track_stream(stream)
+                self._progress_done += self._remaining[stream] - bytes_remaining
+                self._remaining[stream] = bytes_remaining
+                # downloads fill 0..90, the ffmpeg merge fills the rest
+                done, total = self._progress_done, self._progress_total
+                self._report_progress((done * 90) // total)
         except Exception as e:
             self.worker_signals.error.emit(f"Progress callback error: {e}")
 
+    def _report_progress(self, percent, force=False):
+        """Emits progress only when the integer percent moves, at most ~20 Hz:
+        fast links would otherwise still repaint the bar on every percent.
+        force=True for milestones (90, 100) so the last value is never dropped."""
+        if percent == self._last_pct:
+            return
+        now = monotonic()
+        if not force and now - self._last_emit < PROGRESS_MIN_INTERVAL:
+            return
+        self._last_pct = percent
+        self._last_emit = now
+        self._emit_progress(percent)
+
+    def _track_stream(self, stream):
+        """Adds a stream's size to the combined download total."""
+        self._remaining[stream] = stream.filesize
+        self._progress_total += stream.filesize
+
     def ffmpeg_merge(self, video_path, audio_path, output_file):
+        # HACK write next to the target, rename when done -> no half files on crash
+        part_file = f"{output_file}.{self.job_id}.part"
         merge_cmd = [
             "ffmpeg",
             "-y",
+            "-loglevel",
+            "error",  # HACK stderr only carries real errors
+            "-nostats",
+            "-progress",
+            "pipe:1",  # key=value progress lines on stdout
             "-i",
             video_path,
             "-i",
             audio_path,
             "-c",
             "copy",
-            output_file,
+            "-f",
+            "mp4",  # ".part" suffix hides the container from ffmpeg
+            part_file,
         ]
 
         try:
-            # check=True will raise CalledProcessError if FFmpeg fails
-            subprocess.run(merge_cmd, check=True, capture_output=True, text=True)
+            proc = subprocess.Popen(
+                merge_cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True
+            )
+            # drain stderr in the background -> a full pipe can never stall ffmpeg,
+            # and only the last lines are kept for the error report
+            stderr_tail = deque(maxlen=200)
+            stderr_reader = threading.Thread(
+                target=stderr_tail.extend, args=(proc.stderr,), daemon=True
+            )
+            stderr_reader.start()
+            duration_us = self._duration_s * 1_000_000
+            for line in proc.stdout:
+                key, _, value = line.partition("=")
+                value = value.strip()
+                if key == "out_time_us" and duration_us and value.isdigit():
+                    # real merge fraction -> last 10% of the bar (90..100)
+                    merged = min(int(value) * 10 // duration_us, 10)
+                    self._report_progress(90 + merged)
+            returncode = proc.wait()
+            stderr_reader.join()
+            if returncode != 0:
+                raise subprocess.CalledProcessError(
+                    returncode, merge_cmd, stderr="".join(stderr_tail)
+                )
         except subprocess.CalledProcessError as e:
             # Detailed reporting on FFmpeg failure
             error_message = f"FFmpeg merge failed. Command: {' '.join(merge_cmd)}. Stderr: {e.stderr.strip()}"
@@ -73,6 +219,11 @@ class Worker(QRunnable):
             self.worker_signals.error.emit(f"Ffmpeg merger failed:")
             print(e)
             raise
+        else:
+            replace(part_file, output_file)  # atomic rename, same directory
+        finally:
+            if path.exists(part_file):  # only left behind on failure
+                remove(part_file)
 
     @Slot()
     def run(self):
@@ -104,6 +255,8 @@ class Worker(QRunnable):
         ++ Provide type of error"""
 
         try:
+            # NOTE no shared requests.Session: pytubefix fetches through bare
+            # urllib.urlopen (no pooling to hook into) and requests isn't a dep
             yt = YouTube(
                 self.url,
                 on_progress_callback=self.on_progress_callback,
@@ -132,6 +285,8 @@ class Worker(QRunnable):
                 .first()
             )
 
+            self._duration_s = yt.length or 0
+
             if not video_stream or not audio_stream:
                 self.worker_signals.error.emit(
                     "No suitable video or audio streams found"
@@ -153,40 +308,50 @@ class Worker(QRunnable):
         video_file = path.join(self.temp_yt_folder, "video.mp4")
         audio_file = path.join(self.temp_yt_folder, "audio.mp4")
 
-        self.worker_signals.message.emit("Downloading video (1/2) ..")
-
-        # Attach the progress callback ONLY to the video stream object
-        # video_stream.on_progress = self.on_progress_callback
+        self.worker_signals.message.emit("Downloading video + audio ..")
 
-        video_stream.download(
-            output_path=self.temp_yt_folder,
-            filename="video.mp4",
-            skip_existing=True,
-        )
+        # both sizes up front so the combined percent never jumps backwards
+        with self._progress_lock:
+            self._track_stream(video_stream)
+            self._track_stream(audio_stream)
 
-        self.worker_signals.progress.emit(80)
+        # NOTE keep temp files, no stream_to_buffer() -> ffmpeg pipe:3/4:
+        # + stream_to_buffer skips the SABR path Stream.download() handles
+        # + mp4 demuxer needs seekable input unless the file is fragmented
+        # + ffmpeg reads the fresh temp files back from page cache anyway
+        # independent network I/O -> download both streams at the same time
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            downloads = [
+                pool.submit(
+                    stream.download,
+                    output_path=self.temp_yt_folder,
+                    filename=filename,
+                    skip_existing=True,
+                )
+                for stream, filename in (
+                    (video_stream, "video.mp4"),
+                    (audio_stream, "audio.mp4"),
+                )
+            ]
+        for download in downloads:  # leaving the with-block joined both
+            download.result()  # re-raise a failed download here
 
-        # NOTE not tracking audio download
-        self.worker_signals.message.emit("Downloading audio (2/2)")
-        audio_stream.download(
-            output_path=self.temp_yt_folder,
-            filename="audio.mp4",
-            skip_existing=True,
-        )
-        self.worker_signals.progress.emit(90)  # HACK. signal merfer start
+        self._report_progress(90, force=True)  # HACK. signal merfer start
 
         # prep output
-        safe_title = "".join(c for c in yt.title if c.isalnum() or c in " _-").rstrip()
-        output_file = path.join(self.folder_path, f"{safe_title}.mp4")
+        safe_title = _safe_title(yt.title)
+        output_file = _claim_output(path.join(self.folder_path, f"{safe_title}.mp4"))
 
         # HACK merge - report ffmpeg errors
         try:
             self.worker_signals.message.emit("Merging…😃")
             self.ffmpeg_merge(video_file, audio_file, output_file)
-            self.worker_signals.progress.emit(100)
+            self._report_progress(100, force=True)
         except Exception as e:
             self.worker_signals.error.emit(str(e))
         else:
             self.worker_signals.message.emit(
                 f"Downloaded ↘ {path.basename(output_file)}"
             )
+        finally:
+            _release_output(output_file)
@@ -1,7 +1,6 @@
 from sys import argv as ARGV, exit as EXIT
-from os import makedirs, path
-
-from ghost_workers.worker import Worker
+from os import path
+from functools import lru_cache, partial
 
 # import Worker.Worker as Worker
 
@@ -26,8 +25,82 @@ from PySide6.QtCore import (
     QTimer,
 )
 
+_HOME = path.expanduser("~")  # constant for the process, resolve once
+_DEFAULT_DOWNLOAD_PATH = path.join(_HOME, "Videos", "ytbr")
+_URL_PREFIXES = (
+    "https://youtu.be/",
+    "https://www.youtube.com/watch?v=",
+    "https://m.youtube.com/watch?v=",
+)
+
+
+@lru_cache(maxsize=1)
+def _dark_palette() -> QPalette:
+    """Static dark palette, built on first use (QPalette needs a QApplication)."""
+    # Define dark colors
+    dark_palette = QPalette()
+    dark_palette.setColor(
+        QPalette.Window, QColor(53, 53, 53)
+    )  # Main window background
+    dark_palette.setColor(QPalette.WindowText, Qt.white)  # Main window text
+    dark_palette.setColor(
+        QPalette.Base, QColor(25, 25, 25)
+    )  # Input fields, list views etc. background
+    dark_palette.setColor(QPalette.AlternateBase, QColor(53, 53, 53))
+    dark_palette.setColor(QPalette.ToolTipBase, Qt.white)
+    dark_palette.setColor(QPalette.ToolTipText, Qt.white)
+    dark_palette.setColor(QPalette.Text, Qt.white)  # General text color
+    dark_palette.setColor(QPalette.Button, QColor(53, 53, 53))  # Button background
+    dark_palette.setColor(QPalette.ButtonText, Qt.white)  # Button text
+    dark_palette.setColor(QPalette.BrightText, Qt.red)
+    dark_palette.setColor(QPalette.Link, QColor(42, 130, 218))
+    dark_palette.setColor(
+        QPalette.Highlight, QColor(42, 130, 218)
+    )  # Selection color
+    dark_palette.setColor(QPalette.HighlightedText, Qt.black)  # Text on selection
+
+    return dark_palette
+
 
 class MainApp(QMainWindow):
+    # app-wide QSS, scoped by objectName: Qt parses it once, not per window
+    _URL_INPUT_QSS = """
+        QLineEdit#urlInput {
+            border: 1px solid #4CAF50;
+            border-radius: 6px;
+            padding: 7px 8px 7px 8x;
+            font-size: 14px;
+            color: white;
+        }
+
+        QLineEdit#urlInput:focus {
+            border: 0px;
+        }
+
+        QLineEdit#urlInput::placeholder {
+            color: #999;
+            font-style: italic;
+        }
+    """
+
+    _FILE_BTN_QSS = """
+         QPushButton#fileBtn {
+             /* background-color: red; */
+             /*color: #6BBF59;*/
+             /*border-radius: 16px; Half of width/height */
+             font-size: 28px;
+             margin: 0px 1px 0px 6px;
+             padding-right: 0px;
+             border: 0px
+         }
+        /*
+         QPushButton#fileBtn:hover {
+             background-color: darkred;
+             color: cyan;
+         }
+        */
+    """
+
     def __init__(self):
         # initialise QMainWindow obj
         super().__init__()
@@ -38,8 +111,17 @@ class MainApp(QMainWindow):
         # self.setIcon()
 
         self.apply_dark_palette()
+        self.apply_app_stylesheet()
 
         self.show()
+        # window is up -> load pytubefix now, not on the first Enter press
+        QTimer.singleShot(0, self.warm_worker_import)
+
+    def warm_worker_import(self) -> None:
+        try:
+            import ghost_workers.worker  # noqa: F401  deferred: pulls in pytubefix
+        except ImportError as e:  # reported again (and handled) on submit
+            print(f"ghost_workers import failed: {e}")
 
     def toggle_controls(self, enable: bool) -> None:
         """Helper to enable/disable main UI elements."""
@@ -58,26 +140,7 @@ class MainApp(QMainWindow):
         self.url_input = QLineEdit()
         self.url_input.setClearButtonEnabled(True)  # TODO: set red color
         self.url_input.setPlaceholderText(self.placeholder)
-        self.url_input.setStyleSheet(
-            """
-            QLineEdit {
-                border: 1px solid #4CAF50;
-                border-radius: 6px;
-                padding: 7px 8px 7px 8x;
-                font-size: 14px;
-                color: white;
-            }
-
-            QLineEdit:focus {
-                border: 0px;
-            }
-
-            QLineEdit::placeholder {
-                color: #999;
-                font-style: italic;
-            }
-        """
-        )
+        self.url_input.setObjectName("urlInput")  # styled by _URL_INPUT_QSS
 
         # QStyle
         """
@@ -87,25 +150,7 @@ class MainApp(QMainWindow):
         self.file_choose_btn.setIconSize(QSize(42, 42))
         """
         self.file_choose_btn = QPushButton("📂")  # 
-        self.file_choose_btn.setStyleSheet(
-            """
-             QPushButton {
-                 /* background-color: red; */
-                 /*color: #6BBF59;*/
-                 /*border-radius: 16px; Half of width/height */
-                 font-size: 28px;
-                 margin: 0px 1px 0px 6px;
-                 padding-right: 0px;
-                 border: 0px
-             }
-            /*
-             QPushButton:hover {
-                 background-color: darkred;
-                 color: cyan;
-             }
-            */
-             """
-        )
+        self.file_choose_btn.setObjectName("fileBtn")  # styled by _FILE_BTN_QSS
 
         # Download Btn + input URL combo (QHBoxLayout + QWidget)
         button_url_combo_layout = QHBoxLayout()
@@ -157,80 +202,128 @@ class MainApp(QMainWindow):
         self.url_input.returnPressed.connect(self.url_download_on_return)  # worker init
         self.file_choose_btn.clicked.connect(self.file_chooser)
         self.threadpool = QThreadPool()  # HACK scales to users Threads
+        # one reusable reset timer: restarting it cancels any pending reset, so a
+        # stale timer can never overwrite a newer placeholder message
+        self.placeholder_reset_timer = QTimer(self)
+        self.placeholder_reset_timer.setSingleShot(True)
+        self.placeholder_reset_timer.timeout.connect(self.reset_placeholder)
+        # HACK jobs are network/ffmpeg bound, so cap at 6 rather than CPU count;
+        # QThreadPool queues the rest until a slot frees up
+        self.threadpool.setMaxThreadCount(6)
+        self.active_jobs = 0
+        self.job_count = 0
+        self.job_progress = {}  # job id -> percent, for the one shared bar
+        self.jobs = {}  # job id -> Worker: keeps its signals alive until finished
+        self.folder_tasks = []  # pending MkdirTasks, same reason
 
     def default_download_path(self) -> str:
-        return path.expanduser("~/Videos/ytbr")
+        return _DEFAULT_DOWNLOAD_PATH
 
     def formatted_dwn_path(self) -> str:
-        display_path = self.default_download_path().replace(path.expanduser("~"), "~")
+        display_path = self.default_download_path().replace(_HOME, "~")
         return display_path
 
     def worker_init(self, url: str) -> None:
+        from ghost_workers.worker import Worker  # deferred: pulls in pytubefix
+
         worker = Worker(url, self.current_download_folder)  # HACK !null input
+        job = self.job_count
+        self.job_count += 1
+        self.active_jobs += 1
+        self.job_progress[job] = 0
+        self.jobs[job] = worker
 
-        self.toggle_controls(False)  # HACK off when downloads start
+        self.toggle_controls(False)  # HACK off until the whole batch is done
 
-        worker.worker_signals.progress.connect(self.progress_bar.setValue)
+        worker.worker_signals.progress.connect(partial(self.on_job_progress, job))
         self.url_input.clear()  # HACK clear input once progress starrtss
         self.progress_bar.show()
-        worker.worker_signals.finished.connect(lambda: self.progress_bar.hide())
-        worker.worker_signals.finished.connect(lambda: self.progress_bar.setValue(0))
-        worker.worker_signals.finished.connect(lambda: self.toggle_controls(True))
-
-        def update_placeholder(text: str):
-            self.url_input.setPlaceholderText(text)
-            # QTimer.singleShot(
-            #     1500, lambda: self.url_input.setPlaceholderText(self.placeholder)
-            # )
-            # This prevents intermediate messages ("Downloading video...") from resetting the placeholder.
-            if text.startswith("Downloaded"):
-                QTimer.singleShot(
-                    3500, lambda: self.url_input.setPlaceholderText(self.placeholder)
-                )
-
-        def update_placeholder_error(error: str):
-            self.url_input.setPlaceholderText(f"❌ {error}")
-            print(f"ERROR SIGNAL RECEIVED: {error}")
-            self.progress_bar.hide()
-            self.toggle_controls(True)  # HACK off when downloads start
-            QTimer.singleShot(
-                2500, lambda: self.url_input.setPlaceholderText(self.placeholder)
-            )
+        worker.worker_signals.finished.connect(partial(self.on_job_finished, job))
 
-        worker.worker_signals.message.connect(update_placeholder)
-        worker.worker_signals.error.connect(update_placeholder_error)
+        worker.worker_signals.message.connect(self.update_placeholder)
+        worker.worker_signals.error.connect(self.update_placeholder_error)
 
         self.threadpool.start(worker)
 
+    def reset_placeholder(self) -> None:
+        self.url_input.setPlaceholderText(self.placeholder)
+
+    def update_placeholder(self, text: str) -> None:
+        self.url_input.setPlaceholderText(text)
+        # QTimer.singleShot(
+        #     1500, lambda: self.url_input.setPlaceholderText(self.placeholder)
+        # )
+        # This prevents intermediate messages ("Downloading video...") from resetting the placeholder.
+        if text.startswith("Downloaded"):
+            self.placeholder_reset_timer.start(3500)
+        else:
+            self.placeholder_reset_timer.stop()
+
+    def update_placeholder_error(self, error: str) -> None:
+        self.url_input.setPlaceholderText(f"❌ {error}")
+        print(f"ERROR SIGNAL RECEIVED: {error}")
+        # NOTE finished still follows the error -> on_job_finished resets the UI
+        self.placeholder_reset_timer.start(2500)
+
+    def on_job_progress(self, job: int, percent: int) -> None:
+        self.job_progress[job] = percent
+        # one bar for the batch: average over every job in it
+        total = sum(self.job_progress.values())
+        self.progress_bar.setValue(total // len(self.job_progress))
+
+    def on_job_finished(self, job: int) -> None:
+        self.jobs.pop(job, None)
+        self.job_progress[job] = 100
+        self.active_jobs -= 1
+        if self.active_jobs == 0:  # batch drained -> reset the UI once
+            self.job_progress.clear()
+            self.progress_bar.hide()
+            self.progress_bar.reset()  # native slot: rewinds to "no progress"
+            self.toggle_controls(True)
+
     def url_download_on_return(self):
         url_text = self.url_input.text().strip()
         if not url_text:
             self.url_input.setPlaceholderText("❌ Enter url ... empty")
-            QTimer.singleShot(
-                2000, lambda: self.url_input.setPlaceholderText(self.placeholder)
-            )
+            self.placeholder_reset_timer.start(2000)
             return  # HACK stop execution of function if empty
 
-        if not url_text.startswith("https://youtu.be/"):
+        # several links separated by spaces/newlines -> one job each, repeats dropped
+        urls = list(dict.fromkeys(url_text.split()))
+        if not all(url.startswith(_URL_PREFIXES) for url in urls):
             self.url_input.clear()
             self.url_input.setPlaceholderText("❌ Enter valid Youtube URL")
-            QTimer.singleShot(
-                2000, lambda: self.url_input.setPlaceholderText(self.placeholder)
-            )
+            self.placeholder_reset_timer.start(2000)
             return  # HACK stop execution if URL is invalide
 
         # Triggered by pressing Enter. Uses default folder. *
         folder_path = self.current_download_folder or self.default_download_path()
 
-        # Cross-platform: ensure folder exists, create it if not
-        try:
-            makedirs(folder_path, exist_ok=True)
-        except Exception as e:
-            self.url_input.setPlaceholderText(
-                f"❌ Failed to access folder {folder_path}: {e}"
-            )
+        try:  # already warm after startup; a broken install must not lock the UI
+            from ghost_workers.worker import MkdirTask
+        except ImportError as e:
+            self.url_input.setPlaceholderText(f"❌ {e}")
+            self.placeholder_reset_timer.start(2500)
             return
-        self.worker_init(url_text)
+
+        # Cross-platform: ensure folder exists, create it if not (off the GUI thread)
+        self.toggle_controls(False)  # HACK no double submit while the folder check runs
+
+        task = MkdirTask(folder_path)
+        self.folder_tasks.append(task)
+        task.mkdir_signals.done.connect(partial(self.on_folder_ready, task, urls))
+        task.mkdir_signals.error.connect(partial(self.on_folder_error, task))
+        self.threadpool.start(task)
+
+    def on_folder_ready(self, task, urls: list, folder_path: str) -> None:
+        self.folder_tasks.remove(task)
+        for url in urls:
+            self.worker_init(url)
+
+    def on_folder_error(self, task, error: str) -> None:
+        self.folder_tasks.remove(task)
+        self.url_input.setPlaceholderText(f"❌ {error}")
+        self.toggle_controls(True)
 
     def file_chooser(self):
         # Triggered by clicking the download button. Opens folder dialog.
@@ -240,40 +333,28 @@ class MainApp(QMainWindow):
 
         if folder:
             self.current_download_folder = folder  # HACK last lesson...no coupling
-            self.download_path_label.setText(
-                f"{folder.replace(path.expanduser( "~"), "~")}"
-            )
+            self.download_path_label.setText(folder.replace(_HOME, "~"))
         else:
             self.url_input.setPlaceholderText(" No folder selected ‼️")
-            QTimer.singleShot(
-                1500, lambda: self.url_input.setPlaceholderText(self.placeholder)
-            )
+            self.placeholder_reset_timer.start(1500)
 
-    def apply_dark_palette(self):
-        # Define dark colors
-        dark_palette = QPalette()
-        dark_palette.setColor(
-            QPalette.Window, QColor(53, 53, 53)
-        )  # Main window background
-        dark_palette.setColor(QPalette.WindowText, Qt.white)  # Main window text
-        dark_palette.setColor(
-            QPalette.Base, QColor(25, 25, 25)
-        )  # Input fields, list views etc. background
-        dark_palette.setColor(QPalette.AlternateBase, QColor(53, 53, 53))
-        dark_palette.setColor(QPalette.ToolTipBase, Qt.white)
-        dark_palette.setColor(QPalette.ToolTipText, Qt.white)
-        dark_palette.setColor(QPalette.Text, Qt.white)  # General text color
-        dark_palette.setColor(QPalette.Button, QColor(53, 53, 53))  # Button background
-        dark_palette.setColor(QPalette.ButtonText, Qt.white)  # Button text
-        dark_palette.setColor(QPalette.BrightText, Qt.red)
-        dark_palette.setColor(QPalette.Link, QColor(42, 130, 218))
-        dark_palette.setColor(
-            QPalette.Highlight, QColor(42, 130, 218)
-        )  # Selection color
-        dark_palette.setColor(QPalette.HighlightedText, Qt.black)  # Text on selection
+    def apply_app_stylesheet(self):
+        app = QApplication.instance()
+        qss = self._URL_INPUT_QSS + self._FILE_BTN_QSS
+        existing = app.styleSheet()
+        if qss in existing:  # HACK first window only -> one QSS parse per app
+            return
+        if existing.startswith("file:///"):  # -stylesheet arg: Qt keeps the file URL
+            try:  # strip the prefix like Qt does -> relative paths stay relative
+                with open(existing[len("file:///") :], encoding="utf-8") as qss_file:
+                    existing = qss_file.read()
+            except OSError:  # Qt only warns on a bad -stylesheet, so do we
+                existing = ""
+        app.setStyleSheet(existing + qss)  # append, never drop a user stylesheet
 
+    def apply_dark_palette(self):
         # Apply the palette to the application
-        QApplication.instance().setPalette(dark_palette)
+        QApplication.instance().setPalette(_dark_palette())
 
 
 def main():
@@ -1,12 +1,13 @@
+import itertools
 import os
 import shutil
 import subprocess
 import sys
+from types import SimpleNamespace
 from unittest.mock import MagicMock, call, patch
 
 import pytest
-from ghost_workers.worker import Worker, WorkerSignals
-
+from ghost_workers.worker import MkdirTask, Worker, WorkerSignals, _safe_title
 
 # --- FIXME: Add the project root to sys.path for module discovery ---
 # This ensures that 'ghost_workers' can be imported regardless of where the pytest command is executed
@@ -33,11 +34,31 @@ def worker_instance(url_input, folder_path_input):
     return Worker(url_input, folder_path_input)
 
 
+@pytest.fixture
+def slow_clock(mocker):
+    """Advances monotonic() 1 s per call, so the ~20 Hz throttle never kicks in."""
+    return mocker.patch(
+        "ghost_workers.worker.monotonic", side_effect=itertools.count(start=1.0)
+    )
+
+
+@pytest.fixture
+def patch_cleanup(mocker):
+    """Patches the run() cleanup surface (os.path.exists + shutil.rmtree) once.
+    Function-scoped on purpose: a module-wide exists=True would break the
+    ffmpeg_merge .part cleanup tests."""
+    return SimpleNamespace(
+        exists=mocker.patch("os.path.exists", return_value=True),
+        rmtree=mocker.patch("shutil.rmtree"),
+    )
+
+
 # Mock the WorkerSignals class itself to ensure a clean, isolated mock is created every time the Worker constructor is called.
-# We use autouse=True to ensure the patch is applied to all tests.
-@pytest.fixture(autouse=True)
+# Only tests asserting on signals request it (via signalled_worker).
+@pytest.fixture
 def mock_signals_class(mocker):
-    """Patches WorkerSignals class to use a MagicMock for every test."""
+    """Patches WorkerSignals with a MagicMock for the tests that request it
+    (through signalled_worker)."""
     # Create a mock instance with mocked .emit method for error signal checks
     mock_error_emit = mocker.MagicMock()
     mock_signals_instance = mocker.MagicMock(
@@ -56,29 +77,53 @@ def mock_signals_class(mocker):
     return mock_signals_instance.error.emit
 
 
+@pytest.fixture
+def signalled_worker(mock_signals_class, url_input, folder_path_input):
+    """Provides a Worker built after WorkerSignals is mocked, so every emit is recorded."""
+    return Worker(url_input, folder_path_input)
+
+
 # Test Initialization
 def test_worker_initialization(worker_instance, url_input, folder_path_input):
     """Test if Worker is initialized correctly."""
     assert worker_instance.url == url_input
     # os.path.expanduser is used in __init__
     assert worker_instance.folder_path == os.path.expanduser(folder_path_input)
-    assert worker_instance.temp_yt_folder == "/tmp/ytbr"
+    assert worker_instance.temp_yt_folder.startswith("/tmp/ytbr_")
+
+
+def test_worker_temp_folders_are_per_job(url_input, folder_path_input):
+    """Test that parallel jobs never share (and clean up) the same temp folder."""
+    first = Worker(url_input, folder_path_input)
+    second = Worker(url_input, folder_path_input)
+    assert first.temp_yt_folder != second.temp_yt_folder
 
 
 # Test Empty URL Error
-def test_download_video_empty_url(worker_instance, mock_signals_class):
+def test_download_video_empty_url(mock_signals_class, signalled_worker, tmp_path):
     """Test that an error signal is emitted for an empty URL within download_video."""
-    worker_instance.url = ""
-    worker_instance.download_video()
+    signalled_worker.temp_yt_folder = str(tmp_path)  # no /tmp/ytbr_<uuid> left behind
+    signalled_worker.url = ""
+    signalled_worker.download_video()
 
     mock_signals_class.assert_called_once_with("Kua Serious Buda ‼️")
 
 
+def mock_ffmpeg_proc(stdout_lines=(), stderr="", returncode=0):
+    """Builds a stand-in for the ffmpeg Popen object."""
+    proc = MagicMock(returncode=returncode)
+    proc.stdout = iter(stdout_lines)
+    proc.stderr = iter(stderr.splitlines(keepends=True))
+    proc.wait.return_value = returncode
+    return proc
+
+
 # FFmpeg Merge Success
-@patch("subprocess.run")
-def test_ffmpeg_merge_success(mock_run, worker_instance):
+@patch("ghost_workers.worker.replace")
+@patch("subprocess.Popen")
+def test_ffmpeg_merge_success(mock_popen, mock_replace, worker_instance):
     """Test successful FFmpeg merge command execution."""
-    mock_run.return_value = MagicMock(returncode=0)
+    mock_popen.return_value = mock_ffmpeg_proc()
 
     video_path = "/tmp/ytbr/video.mp4"
     audio_path = "/tmp/ytbr/audio.mp4"
@@ -89,95 +134,277 @@ def test_ffmpeg_merge_success(mock_run, worker_instance):
     expected_cmd = [
         "ffmpeg",
         "-y",
+        "-loglevel",
+        "error",
+        "-nostats",
+        "-progress",
+        "pipe:1",
         "-i",
         video_path,
         "-i",
         audio_path,
         "-c",
         "copy",
-        output_file,
+        "-f",
+        "mp4",
+        f"{output_file}.{worker_instance.job_id}.part",
     ]
-    mock_run.assert_called_once_with(
-        expected_cmd, check=True, capture_output=True, text=True
+    mock_popen.assert_called_once_with(
+        expected_cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True
+    )
+    # the finished file only appears under its real name once ffmpeg succeeded
+    mock_replace.assert_called_once_with(
+        f"{output_file}.{worker_instance.job_id}.part", output_file
     )
 
 
-# Test FFmpeg Merge Failure (CalledProcessError)
-@patch("subprocess.run")
-def test_ffmpeg_merge_failure(mock_run, worker_instance, mock_signals_class):
-    """Test handling of subprocess.CalledProcessError during FFmpeg merge."""
-    error_output = "FFmpeg failed to process stream."
-    mock_run.side_effect = subprocess.CalledProcessError(
-        returncode=1, cmd="ffmpeg", stderr=error_output
+# FFmpeg Merge Progress
+@patch("ghost_workers.worker.replace")
+@patch("subprocess.Popen")
+def test_ffmpeg_merge_reports_progress(
+    mock_popen, mock_replace, signalled_worker, slow_clock
+):
+    """Test that ffmpeg -progress output is mapped onto the 90..100 range."""
+    mock_popen.return_value = mock_ffmpeg_proc(
+        [
+            "out_time_us=N/A\n",
+            "out_time_us=5000000\n",
+            "total_size=1024\n",
+            "out_time_us=10000000\n",
+            "progress=end\n",
+        ]
     )
+    signalled_worker._duration_s = 10
+
+    signalled_worker.ffmpeg_merge("v", "a", "o")
+
+    assert signalled_worker.worker_signals.progress.emit.call_args_list == [
+        call(95),
+        call(100),
+    ]
+
+
+# Test FFmpeg Merge Failure (non-zero exit)
+@patch("ghost_workers.worker.replace")
+@patch("ghost_workers.worker.remove")
+@patch("os.path.exists", return_value=True)
+@patch("subprocess.Popen")
+def test_ffmpeg_merge_failure(
+    mock_popen,
+    mock_exists,
+    mock_remove,
+    mock_replace,
+    mock_signals_class,
+    signalled_worker,
+):
+    """Test handling of a failing FFmpeg process during merge."""
+    error_output = "FFmpeg failed to process stream."
+    mock_popen.return_value = mock_ffmpeg_proc(stderr=error_output, returncode=1)
 
     # Assert that the CalledProcessError is re-raised
     with pytest.raises(subprocess.CalledProcessError):
-        worker_instance.ffmpeg_merge("v", "a", "o")
+        signalled_worker.ffmpeg_merge("v", "a", "o")
 
+    mock_remove.assert_called_once_with(f"o.{signalled_worker.job_id}.part")
+    mock_replace.assert_not_called()
     error_call = mock_signals_class.call_args[0][0]
     assert error_call.startswith("FFmpeg merge failed. Command: ")
     assert error_call.endswith(f". Stderr: {error_output}")
 
 
+# Test FFmpeg Merge Failure keeps only the stderr tail
+@patch("subprocess.Popen")
+def test_ffmpeg_merge_failure_keeps_stderr_tail(mock_popen, signalled_worker):
+    """Test that a chatty failing ffmpeg only reports its last 200 stderr lines."""
+    stderr = "".join(f"line {i}\n" for i in range(1000))
+    mock_popen.return_value = mock_ffmpeg_proc(stderr=stderr, returncode=1)
+
+    with pytest.raises(subprocess.CalledProcessError) as excinfo:
+        signalled_worker.ffmpeg_merge("v", "a", "o")
+
+    lines = excinfo.value.stderr.splitlines()
+    assert len(lines) == 200
+    assert lines[0] == "line 800"
+    assert lines[-1] == "line 999"
+
+
 # Test FFmpeg Not Found (FileNotFoundError)
-@patch("subprocess.run")
-def test_ffmpeg_not_found(mock_run, worker_instance, mock_signals_class):
+@patch("subprocess.Popen")
+def test_ffmpeg_not_found(mock_popen, mock_signals_class, signalled_worker):
     """Test handling of FileNotFoundError (FFmpeg not in $PATH)."""
-    mock_run.side_effect = FileNotFoundError()
+    mock_popen.side_effect = FileNotFoundError()
 
     # Assert that the FileNotFoundError is re-raised
     with pytest.raises(FileNotFoundError):
-        worker_instance.ffmpeg_merge("v", "a", "o")
+        signalled_worker.ffmpeg_merge("v", "a", "o")
 
     mock_signals_class.assert_called_once_with("FFmpeg not found in $PATH.")
 
 
+# Two jobs, same title
+@patch("ghost_workers.worker.replace")
+@patch("subprocess.Popen")
+@patch("ghost_workers.worker.YouTube")
+@patch("ghost_workers.worker.makedirs")
+def test_same_title_jobs_never_share_output(
+    mock_makedirs, mock_youtube, mock_popen, mock_replace, url_input, folder_path_input
+):
+    """Test that overlapping jobs with one title get their own .part and final file."""
+    mock_youtube.return_value.title = "!!!"  # sanitizes to the "ytdl" fallback
+    mock_popen.return_value = mock_ffmpeg_proc()
+    first = Worker(url_input, folder_path_input)
+    second = Worker(url_input, folder_path_input)
+
+    # second job merges while the first one still holds its output name
+    mock_replace.side_effect = lambda *args: (
+        second.download_video() if mock_replace.call_count == 1 else None
+    )
+    first.download_video()
+
+    (first_part, first_out), (second_part, second_out) = [
+        c.args for c in mock_replace.call_args_list
+    ]
+    assert first_out == os.path.join(first.folder_path, "ytdl.mp4")
+    assert second_out == os.path.join(second.folder_path, "ytdl (1).mp4")
+    assert first_part == f"{first_out}.{first.job_id}.part"
+    assert second_part == f"{second_out}.{second.job_id}.part"
+
+
 # Test Progress Callback
-def test_on_progress_callback(worker_instance):
+def test_on_progress_callback(signalled_worker):
     """Test that progress signal is correctly emitted with the right percentage."""
     mock_stream = MagicMock()
     mock_stream.filesize = 1000  # Total bytes
     bytes_remaining = 500
 
-    worker_instance.on_progress_callback(mock_stream, b"chunk", bytes_remaining)
+    signalled_worker.on_progress_callback(mock_stream, b"chunk", bytes_remaining)
+
+    # downloads are scaled onto 0..90, merge takes the rest
+    signalled_worker.worker_signals.progress.emit.assert_called_once_with(45)
+
+
+def test_on_progress_callback_skips_unchanged_percent(signalled_worker, slow_clock):
+    """Test that chunks which do not move the integer percent are not re-emitted."""
+    mock_stream = MagicMock()
+    mock_stream.filesize = 1000
+
+    for bytes_remaining in (500, 499, 495, 400):
+        signalled_worker.on_progress_callback(mock_stream, b"chunk", bytes_remaining)
 
-    worker_instance.worker_signals.progress.emit.assert_called_once_with(50)
+    assert signalled_worker.worker_signals.progress.emit.call_args_list == [
+        call(45),
+        call(54),
+    ]
+
+
+def test_on_progress_callback_throttles_to_20hz(signalled_worker, mocker):
+    """Test that updates < 50 ms apart are coalesced, but milestones are not."""
+    mocker.patch(
+        "ghost_workers.worker.monotonic", side_effect=[10.0, 10.01, 10.02, 10.07, 10.08]
+    )
+    mock_stream = MagicMock(filesize=100)
+
+    for bytes_remaining in (90, 80, 70, 60):  # 9%, 18%, 27%, 36% of 0..90
+        signalled_worker.on_progress_callback(mock_stream, b"chunk", bytes_remaining)
+    signalled_worker._report_progress(90, force=True)
+
+    assert signalled_worker.worker_signals.progress.emit.call_args_list == [
+        call(9),
+        call(36),
+        call(90),
+    ]
+
+
+def test_on_progress_callback_combines_streams(signalled_worker, slow_clock):
+    """Test that concurrent video and audio chunks report one combined percent."""
+    video, audio = MagicMock(filesize=600), MagicMock(filesize=400)
+    signalled_worker._track_stream(video)
+    signalled_worker._track_stream(audio)
+
+    signalled_worker.on_progress_callback(video, b"chunk", 300)  # 300 / 1000
+    signalled_worker.on_progress_callback(audio, b"chunk", 0)  # 700 / 1000
+
+    assert signalled_worker.worker_signals.progress.emit.call_args_list == [
+        call(27),
+        call(63),
+    ]
+
+
+# Test Title Sanitization
+@pytest.mark.parametrize(
+    "title, expected",
+    [
+        ("TestYtTitle", "TestYtTitle"),
+        ("Never Gonna Give You Up (Official)", "Never Gonna Give You Up Official"),
+        ("Café_Ünïcode 2024!", "Café_Ünïcode 2024"),
+        ("a/b\\c:d*e?", "abcde"),
+        ("🎵🎵 ", "ytdl"),
+        ("!!!", "ytdl"),
+        ("tab\tnew\nline", "tabnewline"),
+    ],
+)
+def test_safe_title(title, expected):
+    """Test that titles keep alnum, space, '_' and '-' only, with a fallback name."""
+    assert _safe_title(title) == expected
 
 
 # --- Test Cleanup in run() ---
 
 
-@patch("os.path.exists", return_value=True)
-@patch("shutil.rmtree")
 @patch("ghost_workers.worker.Worker.download_video")
-def test_run_cleanup_on_success(
-    mock_download, mock_rmtree, mock_exists, worker_instance
-):
+def test_run_cleanup_on_success(mock_download, patch_cleanup, signalled_worker):
     """Test cleanup (rmtree) is called when run() succeeds."""
     mock_download.return_value = None
 
-    worker_instance.run()
+    signalled_worker.run()
 
-    worker_instance.worker_signals.finished.emit.assert_called_once()
-    mock_rmtree.assert_called_once_with(worker_instance.temp_yt_folder)
+    signalled_worker.worker_signals.finished.emit.assert_called_once()
+    patch_cleanup.rmtree.assert_called_once_with(signalled_worker.temp_yt_folder)
 
 
-@patch("os.path.exists", return_value=True)
-@patch("shutil.rmtree")
 @patch(
     "ghost_workers.worker.Worker.download_video",
     side_effect=ValueError("Test Download Error"),
 )
 def test_run_cleanup_on_failure(
-    mock_download, mock_rmtree, mock_exists, worker_instance, mock_signals_class
+    mock_download, patch_cleanup, mock_signals_class, signalled_worker
 ):
     """Test cleanup (rmtree) is called when run() fails."""
 
-    worker_instance.run()
+    signalled_worker.run()
 
     mock_signals_class.assert_called_once_with("Test Download Error")
-    mock_rmtree.assert_called_once_with(worker_instance.temp_yt_folder)
+    patch_cleanup.rmtree.assert_called_once_with(signalled_worker.temp_yt_folder)
+
+
+# --- Test MkdirTask ---
+
+
+@patch("ghost_workers.worker.makedirs")
+def test_mkdir_task_success(mock_makedirs):
+    """Test that the folder is created off-thread and done carries its path."""
+    task = MkdirTask("/tmp/ytbr-out")
+    task.mkdir_signals = MagicMock()
+
+    task.run()
+
+    mock_makedirs.assert_called_once_with("/tmp/ytbr-out", exist_ok=True)
+    task.mkdir_signals.done.emit.assert_called_once_with("/tmp/ytbr-out")
+    task.mkdir_signals.error.emit.assert_not_called()
+
+
+@patch("ghost_workers.worker.makedirs", side_effect=PermissionError("denied"))
+def test_mkdir_task_failure(mock_makedirs):
+    """Test that a failing makedirs is reported through the error signal."""
+    task = MkdirTask("/root/nope")
+    task.mkdir_signals = MagicMock()
+
+    task.run()
+
+    task.mkdir_signals.error.emit.assert_called_once_with(
+        "Failed to access folder /root/nope: denied"
+    )
+    task.mkdir_signals.done.emit.assert_not_called()
 
 
 # --- Mock PyTubeFix stream selection ---